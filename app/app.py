@@ -1,12 +1,15 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import io
 import sys
 import os
+import threading
 
 # Add parent directory to path to import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from scheduler.scheduler import JobShopScheduler
+from scheduler.scheduler import JobShopScheduler, SEARCH_STRATEGIES
 from visualization.visualizer import ScheduleVisualizer
 
 st.set_page_config(
@@ -15,6 +18,74 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource
+def get_visualizer() -> ScheduleVisualizer:
+    """Share one stateless visualizer across reruns and sessions."""
+    return ScheduleVisualizer()
+
+@st.cache_data(show_spinner=False)
+def load_input(csv_bytes: bytes) -> pd.DataFrame:
+    """Parse the job CSV once per distinct file content."""
+    scheduler = JobShopScheduler()
+    scheduler.load_data(io.BytesIO(csv_bytes))
+    return scheduler.jobs_data
+
+@st.cache_data(show_spinner=False)
+def run_pipeline(csv_bytes: bytes, num_workers: int, time_limit: float,
+                 strategy: str = 'auto', _on_scheduler=None
+                 ) -> tuple[pd.DataFrame, float, np.ndarray, np.ndarray, np.ndarray]:
+    """Load, model and solve the schedule, cached on the CSV content and solver settings.
+
+    _on_scheduler (not part of the cache key) receives the scheduler just before
+    solving so its intermediate solutions can be polled from another thread.
+    """
+    scheduler = JobShopScheduler(strategy=strategy)
+    scheduler.load_data(io.BytesIO(csv_bytes))
+    scheduler.create_model()
+    if _on_scheduler is not None:
+        _on_scheduler(scheduler)
+    schedule_df = scheduler.solve(num_workers=num_workers, max_time_in_seconds=time_limit)
+    makespan = scheduler.get_makespan()
+    
+    # Calculate utilization rates
+    machines, before_rates = scheduler.get_initial_machine_utilization()
+    _, after_rates = scheduler.get_optimized_machine_utilization(schedule_df)
+    return schedule_df, makespan, machines, before_rates, after_rates
+
+def run_pipeline_with_preview(visualizer, *args, refresh_seconds=1.0):
+    """Run run_pipeline in a worker thread, showing the best Gantt chart found so far."""
+    started = {}
+    outcome = {}
+    
+    def worker():
+        try:
+            outcome['result'] = run_pipeline(
+                *args, _on_scheduler=lambda scheduler: started.update(scheduler=scheduler))
+        except Exception as e:
+            outcome['error'] = e
+    
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    
+    preview = st.empty()
+    shown = 0
+    while thread.is_alive():
+        thread.join(timeout=refresh_seconds)
+        scheduler = started.get('scheduler')
+        callback = scheduler.solution_callback if scheduler else None
+        if callback is None or callback.solution_count == shown or not thread.is_alive():
+            continue
+        shown = callback.solution_count
+        schedule_df, objective = scheduler.get_intermediate_schedule()
+        with preview.container():
+            st.caption(f"⏳ Best schedule so far (solution #{shown}, objective {objective:.0f}) — still searching...")
+            st.plotly_chart(visualizer.create_gantt_chart(schedule_df), use_container_width=True)
+    preview.empty()
+    
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
 def main():
     st.title("🚀 Smart AI Job-Shop Scheduler for SMEs")
     st.markdown("""
@@ -34,37 +105,57 @@ def main():
     )
     
     # Use sample data if no file uploaded
-    csv_path = None # Initialize to None
+    csv_bytes = None # Initialize to None
     if uploaded_file is None:
         st.sidebar.info("No file uploaded. Using sample data.")
-        csv_path = "data/sample_jobs.csv"
+        if os.path.exists("data/sample_jobs.csv"):
+            with open("data/sample_jobs.csv", "rb") as f:
+                csv_bytes = f.read()
     else:
         st.sidebar.success("CSV file uploaded successfully!")
-        csv_path = uploaded_file
+        csv_bytes = uploaded_file.getvalue()
     
-    # Initialize scheduler and visualizer
-    scheduler = JobShopScheduler()
-    visualizer = ScheduleVisualizer()
+    # Solver settings in sidebar
+    st.sidebar.subheader("🧮 Solver Settings")
+    num_workers = st.sidebar.number_input(
+        "Parallel search workers",
+        min_value=1,
+        max_value=64,
+        value=min(64, os.cpu_count() or 8),
+        help="Number of CP-SAT workers searching in parallel."
+    )
+    time_limit = st.sidebar.number_input(
+        "Time limit (seconds)",
+        min_value=1.0,
+        max_value=3600.0,
+        value=60.0,
+        step=10.0,
+        help="Maximum solve time. Raise it for hard instances; the best schedule found so far is returned."
+    )
+    strategy = st.sidebar.selectbox(
+        "Search strategy",
+        list(SEARCH_STRATEGIES),
+        help="auto: CP-SAT default portfolio. core: core-based optimization without LP relaxation. "
+             "no_lp: default search without LP relaxation."
+    )
     
-    # Check if csv_path is set before attempting to load data
-    if csv_path:
+    # Initialize visualizer
+    visualizer = get_visualizer()
+    
+    # Check if csv_bytes is set before attempting to load data
+    if csv_bytes:
         try:
             # Load and display data in an expander
-            scheduler.load_data(csv_path)
+            jobs_data = load_input(csv_bytes)
             with st.expander("📂 View Input Data", expanded=True):
                 st.subheader("Loaded Job Data")
-                st.dataframe(scheduler.jobs_data)
+                st.dataframe(jobs_data)
             
             # Run Optimizer button in sidebar
             if st.sidebar.button("✨ Run Optimizer"):
                 with st.spinner("Optimizing schedule..."):
-                    scheduler.create_model()
-                    schedule_df = scheduler.solve()
-                    makespan = scheduler.get_makespan()
-                    
-                    # Calculate utilization rates
-                    before_util = scheduler.get_initial_machine_utilization()
-                    after_util = scheduler.get_optimized_machine_utilization(schedule_df)
+                    schedule_df, makespan, machines, before_rates, after_rates = run_pipeline_with_preview(
+                        visualizer, csv_bytes, int(num_workers), float(time_limit), strategy)
                     
                     # --- Optimization Results Section ---
                     st.header("📈 Optimization Results")
@@ -74,8 +165,8 @@ def main():
                         st.metric(label="Total Completion Time (Makespan)", value=f"{makespan:.1f} time units", delta="Lower is better")
                     
                     # Calculate percentage improvement for utilization
-                    initial_total_util = sum(before_util.values()) / len(before_util) if before_util else 0
-                    optimized_total_util = sum(after_util.values()) / len(after_util) if after_util else 0
+                    initial_total_util = before_rates.mean() if len(before_rates) else 0
+                    optimized_total_util = after_rates.mean() if len(after_rates) else 0
                     
                     util_improvement_percent = 0
                     if initial_total_util > 0:
@@ -99,14 +190,14 @@ def main():
                     # Display utilization comparison in an expander
                     with st.expander("📉 Machine Utilization Analysis", expanded=True):
                         st.subheader("Utilization Comparison (Before vs After Optimization)")
-                        util_fig = visualizer.create_comparison_chart(before_util, after_util)
+                        util_fig = visualizer.create_comparison_chart(machines, before_rates, after_rates)
                         st.plotly_chart(util_fig, use_container_width=True)
                         st.info("See how machine utilization rates improve after optimization.")
                     
                     # Display detailed schedule in an expander
                     with st.expander("📋 Detailed Optimized Schedule", expanded=False):
                         st.subheader("Detailed Schedule Table")
-                        st.dataframe(schedule_df.sort_values(['MachineID', 'Start']))
+                        st.dataframe(schedule_df)
                         st.info("Scroll to view the exact start, end, and duration for each task.")
                     
         except Exception as e:
@@ -1,23 +1,137 @@
-from ortools.sat.python import cp_model
 import pandas as pd
 import numpy as np
+import functools
+import heapq
+import os
+
+# ortools and numba are imported on first use rather than at module load, so the
+# Streamlit app can render its first page before these heavy imports finish.
+
+
+def spt_schedule(job_ids, machine_ids, durations, n_machines):
+    """Shortest Processing Time list schedule over integer-coded task arrays.
+
+    Rows must be grouped by job (codes 0..n_jobs-1, ascending) and ordered by
+    TaskID within each job. Returns the start time of every row.
+    """
+    n = len(job_ids)
+    starts = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return starts
+
+    n_jobs = job_ids[n - 1] + 1
+    job_first = np.full(n_jobs, -1, dtype=np.int64)
+    job_stop = np.zeros(n_jobs, dtype=np.int64)
+    for row in range(n):
+        if job_first[job_ids[row]] < 0:
+            job_first[job_ids[row]] = row
+        job_stop[job_ids[row]] = row + 1
+
+    machine_free = np.zeros(n_machines, dtype=np.int64)
+    job_ready = np.zeros(n_jobs, dtype=np.int64)
+
+    # Each heap entry is the next unscheduled task of a job: (duration, job, row)
+    candidates = [(np.int64(0), np.int64(0), np.int64(0))]
+    candidates.pop()
+    for job in range(n_jobs):
+        row = job_first[job]
+        if row >= 0:
+            heapq.heappush(candidates, (np.int64(durations[row]), np.int64(job), np.int64(row)))
+
+    while len(candidates) > 0:
+        duration, job, row = heapq.heappop(candidates)
+        machine = machine_ids[row]
+        start = max(job_ready[job], machine_free[machine])
+        starts[row] = start
+        job_ready[job] = start + duration
+        machine_free[machine] = start + duration
+        if row + 1 < job_stop[job]:
+            heapq.heappush(candidates, (np.int64(durations[row + 1]), job, np.int64(row + 1)))
+
+    return starts
+
+
+@functools.lru_cache(maxsize=None)
+def _spt_kernel():
+    """Return spt_schedule JIT-compiled with Numba, or as plain Python if Numba is missing."""
+    try:
+        from numba import njit
+    except ImportError:  # Numba is optional; fall back to plain Python
+        return spt_schedule
+    return njit(cache=True)(spt_schedule)
+
+
+@functools.lru_cache(maxsize=None)
+def _solution_callback_class():
+    """Define the CP-SAT solution callback once ortools has been imported."""
+    from ortools.sat.python import cp_model
+
+    class _SolutionCallback(cp_model.CpSolverSolutionCallback):
+        """Keep the latest feasible solution so it can be read while the search runs."""
+
+        def __init__(self, start_vars, end_vars):
+            super().__init__()
+            self._start_vars = start_vars
+            self._end_vars = end_vars
+            self.solution_count = 0
+            # (objective, starts, ends) of the most recent solution, replaced atomically
+            self.best = None
+
+        def on_solution_callback(self):
+            starts = np.array([self.Value(v) for v in self._start_vars], dtype=np.int64)
+            ends = np.array([self.Value(v) for v in self._end_vars], dtype=np.int64)
+            self.best = (self.ObjectiveValue(), starts, ends)
+            self.solution_count += 1
+
+    return _SolutionCallback
+
+
+# CP-SAT parameter presets selectable as a search strategy. 'auto' keeps the
+# solver's default portfolio; the others trade the LP relaxation for faster
+# propagation, which often pays off on pure disjunctive (job-shop) models.
+SEARCH_STRATEGIES = {
+    'auto': {},
+    'core': {
+        'optimize_with_core': True,
+        'linearization_level': 0,
+        'boolean_encoding_level': 0,
+    },
+    'no_lp': {
+        'linearization_level': 0,
+    },
+}
+
 
 class JobShopScheduler:
-    def __init__(self):
+    def __init__(self, strategy='auto'):
+        if strategy not in SEARCH_STRATEGIES:
+            raise ValueError(f"Unknown search strategy '{strategy}'. "
+                             f"Choose one of: {', '.join(SEARCH_STRATEGIES)}.")
+        self.solver_params = dict(SEARCH_STRATEGIES[strategy])
         self.model = None
         self.solver = None
         self.jobs_data = None
         self.machines = None
         self.jobs = None
         self.horizon = None
+        self._job_indices = None
+        self._cols = None
+        self.solution_callback = None
         
     def load_data(self, csv_path):
         """Load job data from CSV file or file-like object."""
+        # Parse with the Arrow CSV reader into Arrow-backed columns
+        read_options = {'engine': 'pyarrow', 'dtype_backend': 'pyarrow'}
         if hasattr(csv_path, 'read'):
             csv_path.seek(0)
-            self.jobs_data = pd.read_csv(csv_path)
+            self.jobs_data = pd.read_csv(csv_path, **read_options)
         else:
-            self.jobs_data = pd.read_csv(str(csv_path))
+            self.jobs_data = pd.read_csv(str(csv_path), **read_options)
+
+        # Jobs and machines are low-cardinality keys; dictionary-encode them so
+        # grouping and unique lookups work on integer codes
+        self.jobs_data['JobID'] = self.jobs_data['JobID'].astype('category')
+        self.jobs_data['MachineID'] = self.jobs_data['MachineID'].astype('category')
 
         # Ensure Deadline column exists, fill with horizon if not present
         if 'Deadline' not in self.jobs_data.columns:
@@ -25,33 +139,94 @@ class JobShopScheduler:
 
         print(f"Jobs Data Head:\n{self.jobs_data.head()}")
         print(f"Jobs Data is Empty: {self.jobs_data.empty}")
-        self.machines = sorted(self.jobs_data['MachineID'].unique())
-        self.jobs = sorted(self.jobs_data['JobID'].unique())
+        # Categories are already sorted and unique
+        self.machines = self.jobs_data['MachineID'].cat.categories.tolist()
+        self.jobs = self.jobs_data['JobID'].cat.categories.tolist()
 
         # Calculate horizon based on total duration, then use it for missing deadlines
         self.horizon = int(self.jobs_data['Duration'].sum())
         self.jobs_data['Deadline'] = self.jobs_data['Deadline'].fillna(self.horizon).astype(int)
+
+        # Sort tasks within each job and cache column arrays / per-job row positions
+        # so model building does not have to re-filter the DataFrame per job.
+        self.jobs_data.sort_values(['JobID', 'TaskID'], inplace=True)
+        self.jobs_data.reset_index(drop=True, inplace=True)
+        self._job_indices = self.jobs_data.groupby('JobID', sort=False, observed=True).indices
+        self._cols = {c: self.jobs_data[c].to_numpy()
+                      for c in ['JobID', 'TaskID', 'MachineID', 'Duration', 'Deadline']}
         
+    def _spt_dispatch(self):
+        """Build a feasible schedule with the Shortest Processing Time dispatching rule.
+
+        Returns a dict mapping (job, task) to its start time and the objective value
+        (makespan plus total tardiness) of that schedule.
+        """
+        _, job_codes = np.unique(self._cols['JobID'], return_inverse=True)
+        _, machine_codes = np.unique(self._cols['MachineID'], return_inverse=True)
+        durations = self._cols['Duration'].astype(np.int64)
+        start_times = _spt_kernel()(job_codes.astype(np.int64), machine_codes.astype(np.int64),
+                                    durations, len(self.machines))
+        end_times = start_times + durations
+
+        starts = {(job, task): int(start) for job, task, start in
+                  zip(self._cols['JobID'], self._cols['TaskID'], start_times)}
+        makespan = int(end_times.max()) if len(end_times) else 0
+        tardiness = 0
+        for job in self.jobs:
+            rows = self._job_indices[job]
+            tardiness += max(0, int(end_times[rows[-1]]) - int(self._cols['Deadline'][rows[0]]))
+        return starts, makespan + tardiness
+
+    def _identical_job_groups(self):
+        """Return lists of JobIDs (sorted) whose jobs are interchangeable.
+
+        Two jobs are identical when they visit the same machines in the same order
+        with the same durations and share a deadline. Groups of one are omitted.
+        """
+        sig_to_jobs = {}
+        for job in self.jobs:
+            rows = self._job_indices[job]
+            signature = (tuple(self._cols['MachineID'][rows]),
+                         tuple(self._cols['Duration'][rows].tolist()),
+                         int(self._cols['Deadline'][rows[0]]))
+            sig_to_jobs.setdefault(signature, []).append(job)
+        return [sorted(jobs) for jobs in sig_to_jobs.values() if len(jobs) > 1]
+
     def create_model(self):
         """Create the constraint programming model."""
+        from ortools.sat.python import cp_model
+        
         self.model = cp_model.CpModel()
         self.solver = cp_model.CpSolver()
         
+        # Warm start from a dispatching-rule schedule. Its objective value bounds the
+        # makespan of any better schedule, so it also tightens every time domain.
+        spt_start, spt_objective = self._spt_dispatch()
+        upper_bound = min(self.horizon, spt_objective)
+        
+        # Per-task bounds: a task cannot start before the work of earlier tasks in its
+        # job is done, and must leave room for the work of later tasks in its job.
+        durations = self.jobs_data['Duration']
+        work_before = (durations.groupby(self.jobs_data['JobID'], observed=True).cumsum() - durations).to_numpy()
+        work_after = (durations.groupby(self.jobs_data['JobID'], observed=True).transform('sum')
+                      - durations).to_numpy() - work_before
+        
         # Create variables
         all_tasks = {}
         machine_to_intervals = {machine: [] for machine in self.machines}
         
-        for _, task in self.jobs_data.iterrows():
-            job_id = task['JobID']
-            task_id = task['TaskID']
-            machine_id = task['MachineID']
-            duration = task['Duration']
-            
+        for job_id, task_id, machine_id, duration, before, after in zip(
+                self._cols['JobID'], self._cols['TaskID'],
+                self._cols['MachineID'], self._cols['Duration'],
+                work_before, work_after):
             suffix = f'_{job_id}_{task_id}'
+            duration, before, after = int(duration), int(before), int(after)
             
             # Create interval variable
-            start_var = self.model.NewIntVar(0, self.horizon, f'start{suffix}')
-            end_var = self.model.NewIntVar(0, self.horizon, f'end{suffix}')
+            start_var = self.model.NewIntVar(
+                before, upper_bound - after - duration, f'start{suffix}')
+            end_var = self.model.NewIntVar(
+                before + duration, upper_bound - after, f'end{suffix}')
             interval_var = self.model.NewIntervalVar(
                 start_var, duration, end_var, f'interval{suffix}')
             
@@ -64,45 +239,62 @@ class JobShopScheduler:
             
             machine_to_intervals[machine_id].append(interval_var)
         
+        for (job_id, task_id), task in all_tasks.items():
+            self.model.AddHint(task['start'], spt_start[job_id, task_id])
+        
         # Add constraints
         # 1. No overlap between tasks on same machine
         for machine in self.machines:
             self.model.AddNoOverlap(machine_to_intervals[machine])
         
-        # 2. Task precedence within jobs
+        # 2. Task precedence within jobs (rows are already sorted by JobID, TaskID)
+        task_ids = self._cols['TaskID']
         for job in self.jobs:
-            job_tasks = self.jobs_data[self.jobs_data['JobID'] == job].sort_values('TaskID')
-            for i in range(len(job_tasks) - 1):
-                current_task = (job, job_tasks.iloc[i]['TaskID'])
-                next_task = (job, job_tasks.iloc[i + 1]['TaskID'])
+            rows = self._job_indices[job]
+            for i in range(len(rows) - 1):
+                current_task = (job, task_ids[rows[i]])
+                next_task = (job, task_ids[rows[i + 1]])
                 self.model.Add(
                     all_tasks[current_task]['end'] <= all_tasks[next_task]['start']
                 )
         
-        # 3. Minimize makespan
-        obj_var = self.model.NewIntVar(0, self.horizon, 'makespan')
-        self.model.AddMaxEquality(
-            obj_var,
-            [all_tasks[job, task]['end'] for job in self.jobs
-             for task in self.jobs_data[self.jobs_data['JobID'] == job]['TaskID']]
-        )
+        # 3. Symmetry breaking: identical jobs are interchangeable, so order them by
+        # the start of their first task
+        for group in self._identical_job_groups():
+            for job_a, job_b in zip(group, group[1:]):
+                first_a = task_ids[self._job_indices[job_a][0]]
+                first_b = task_ids[self._job_indices[job_b][0]]
+                self.model.Add(
+                    all_tasks[job_a, first_a]['start'] <= all_tasks[job_b, first_b]['start']
+                )
+        
+        # The last task of each job ends after all its other tasks (precedence above),
+        # so its end variable is the job's completion time and no extra variable is needed.
+        job_last_end = {job: all_tasks[job, task_ids[self._job_indices[job][-1]]]['end']
+                        for job in self.jobs}
+        
+        # 4. Minimize makespan: only job completion times can be the latest end
+        obj_var = self.model.NewIntVar(0, upper_bound, 'makespan')
+        self.model.AddMaxEquality(obj_var, list(job_last_end.values()))
 
         # Add soft constraints for deadlines (bonus feature)
         # We will add a penalty for each unit of time a job finishes after its deadline.
         # This creates a combined objective of minimizing makespan and deadline tardiness.
         objective_terms = [obj_var]
         for job_id in self.jobs:
-            job_tasks = self.jobs_data[self.jobs_data['JobID'] == job_id]
-            job_deadline = job_tasks['Deadline'].iloc[0] # Assuming one deadline per job
+            rows = self._job_indices[job_id]
+            job_deadline = int(self._cols['Deadline'][rows[0]]) # Assuming one deadline per job
+            last_task_end = job_last_end[job_id]
 
-            # Find the end time of the last task for this job
-            last_task_end = self.model.NewIntVar(0, self.horizon, f'job_{job_id}_end')
-            self.model.AddMaxEquality(last_task_end,
-                                      [all_tasks[job_id, task_id]['end'] for task_id in job_tasks['TaskID']])
+            # A job cannot end after upper_bound, so such a deadline can never be missed
+            if job_deadline >= upper_bound:
+                continue
 
-            # Calculate tardiness: max(0, last_task_end - job_deadline)
-            tardiness = self.model.NewIntVar(0, self.horizon, f'job_{job_id}_tardiness')
-            self.model.AddMaxEquality(tardiness, [last_task_end - job_deadline, 0])
+            # Calculate tardiness: max(0, last_task_end - job_deadline). Minimizing the
+            # objective pushes it down onto the max, so a linear lower bound suffices
+            # (the variable's domain already provides the >= 0 side).
+            tardiness = self.model.NewIntVar(0, upper_bound, f'job_{job_id}_tardiness')
+            self.model.Add(tardiness >= last_task_end - job_deadline)
 
             # Add tardiness to the objective with a weight (e.g., 1 to make it equally important as makespan)
             # You can adjust this weight (e.g., 5 or 10) to make meeting deadlines more critical.
@@ -113,65 +305,115 @@ class JobShopScheduler:
         print(f"Number of tasks created in model: {len(all_tasks)}")
         self.all_tasks = all_tasks # Store all_tasks as a class member
         
-    def solve(self):
-        """Solve the scheduling problem."""
+    def solve(self, num_workers=None, max_time_in_seconds=60.0):
+        """Solve the scheduling problem.
+
+        num_workers defaults to the number of available CPUs; max_time_in_seconds
+        bounds the search, returning the best feasible schedule found so far.
+        """
         if not self.model:
             raise ValueError("Model not created. Call create_model() first.")
+        from ortools.sat.python import cp_model
         
         # The model has already been created and all_tasks populated by create_model()
         # all_tasks = self.create_model() # REMOVE THIS LINE
         
-        # Solve the model
-        status = self.solver.Solve(self.model)
+        # Configure a parallel portfolio search with a bounded wall time
+        if num_workers is None:
+            num_workers = os.cpu_count() or 8
+        self.solver.parameters.num_search_workers = max(1, int(num_workers))
+        self.solver.parameters.max_time_in_seconds = float(max_time_in_seconds)
+        self.solver.parameters.log_search_progress = False
+        for name, value in self.solver_params.items():
+            setattr(self.solver.parameters, name, value)
+        
+        self.solver.parameters.enumerate_all_solutions = False
+        
+        # Solve the model, recording each improving solution so callers on another
+        # thread can show the best schedule found so far (see get_intermediate_schedule)
+        # all_tasks keys follow the sorted row order of jobs_data
+        task_vars = [self.all_tasks[job, task] for job, task in
+                     zip(self._cols['JobID'], self._cols['TaskID'])]
+        self.solution_callback = _solution_callback_class()(
+            [t['start'] for t in task_vars], [t['end'] for t in task_vars])
+        status = self.solver.Solve(self.model, self.solution_callback)
         print(f"Solver status: {self.solver.StatusName(status)}")
         
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-            # Extract solution
-            solution = []
-            for job in self.jobs:
-                for task in self.jobs_data[self.jobs_data['JobID'] == job]['TaskID']:
-                    task_data = self.all_tasks[job, task] # Access from self.all_tasks
-                    solution.append({
-                        'JobID': job,
-                        'TaskID': task,
-                        'MachineID': task_data['machine'],
-                        'Start': self.solver.Value(task_data['start']),
-                        'End': self.solver.Value(task_data['end']),
-                        'Duration': self.jobs_data[
-                            (self.jobs_data['JobID'] == job) & 
-                            (self.jobs_data['TaskID'] == task)
-                        ]['Duration'].iloc[0],
-                        'Deadline': self.jobs_data[
-                            (self.jobs_data['JobID'] == job)
-                        ]['Deadline'].iloc[0] # Add deadline to solution for potential display
-                    })
-            
-            solution_df = pd.DataFrame(solution)
+            # Extract solution column-wise
+            solution_df = self._solution_frame(
+                np.array([self.solver.Value(t['start']) for t in task_vars], dtype=np.int64),
+                np.array([self.solver.Value(t['end']) for t in task_vars], dtype=np.int64))
             print(f"Solution DataFrame Head:\n{solution_df.head()}")
             return solution_df
         else:
             raise Exception('No solution found.')
     
+    def get_intermediate_schedule(self):
+        """Return the best schedule found so far during solve() and its objective value.
+
+        Safe to call from another thread while solve() runs; returns (None, None)
+        until the solver has found a first feasible solution.
+        """
+        best = self.solution_callback.best if self.solution_callback else None
+        if best is None:
+            return None, None
+        objective, starts, ends = best
+        return self._solution_frame(starts, ends), objective
+    
+    def _solution_frame(self, starts, ends):
+        """Build a schedule DataFrame from start/end arrays in jobs_data row order.
+
+        The result is sorted by machine and start time once here so callers can
+        display it without re-sorting.
+        """
+        solution_df = pd.DataFrame({
+            'JobID': self._cols['JobID'],
+            'TaskID': self._cols['TaskID'],
+            'MachineID': self._cols['MachineID'],
+            'Start': starts,
+            'End': ends,
+            'Duration': self._cols['Duration'],
+            # Add deadline to solution for potential display (one deadline per job)
+            'Deadline': self.jobs_data.groupby('JobID', observed=True)['Deadline'].transform('first').to_numpy()
+        })
+        solution_df.sort_values(['MachineID', 'Start'], inplace=True, kind='mergesort')
+        solution_df.reset_index(drop=True, inplace=True)
+        return solution_df
+    
     def get_makespan(self):
         """Get the makespan (total completion time) of the solution."""
         if not self.solver:
             raise ValueError("Problem not solved. Call solve() first.")
         return self.solver.ObjectiveValue()
     
+    def _busy_time_by_machine(self, machine_ids, busy):
+        """Sum busy time per machine using NumPy instead of a pandas groupby/apply."""
+        machines, inverse = np.unique(machine_ids, return_inverse=True)
+        totals = np.zeros(len(machines))
+        np.add.at(totals, inverse, busy)
+        return machines, totals
+
     def get_initial_machine_utilization(self):
-        """Calculate initial machine utilization rates based on task durations."""
-        machine_durations = self.jobs_data.groupby('MachineID')['Duration'].sum()
+        """Calculate initial machine utilization rates based on task durations.
+
+        Returns (machines, rates) as NumPy arrays, with machines in sorted order.
+        """
         total_time = self.horizon
         if total_time == 0:
-            return {machine: 0.0 for machine in self.machines}
-        return (machine_durations / total_time).to_dict()
+            return np.array(self.machines), np.zeros(len(self.machines))
+        machines, totals = self._busy_time_by_machine(
+            self.jobs_data['MachineID'].to_numpy(), self.jobs_data['Duration'].to_numpy())
+        return machines, totals / total_time
 
     def get_optimized_machine_utilization(self, schedule_df):
-        """Calculate machine utilization rates from the optimized schedule."""
+        """Calculate machine utilization rates from the optimized schedule.
+
+        Returns (machines, rates) as NumPy arrays, with machines in sorted order.
+        """
         total_time = self.horizon
-        machine_times = schedule_df.groupby('MachineID').apply(
-            lambda x: (x['End'] - x['Start']).sum()
-        )
         if total_time == 0:
-            return {machine: 0.0 for machine in self.machines}
-        return (machine_times / total_time).to_dict() 
\ No newline at end of file
+            return np.array(self.machines), np.zeros(len(self.machines))
+        busy = schedule_df['End'].to_numpy() - schedule_df['Start'].to_numpy()
+        machines, totals = self._busy_time_by_machine(schedule_df['MachineID'].to_numpy(), busy)
+        return machines, totals / total_time
@@ -1,51 +1,61 @@
-import plotly.figure_factory as ff
-import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 
+# plotly is imported inside the create_* methods so importing this module stays cheap
+
+# Define a palette of colors for jobs. Expand if more jobs are expected.
+# These are a few distinct colors, you can add more.
+JOB_COLOR_PALETTE = [
+    'rgb(46, 137, 205)', 'rgb(114, 44, 121)', 'rgb(198, 47, 105)',
+    'rgb(58, 149, 136)', 'rgb(107, 127, 135)', 'rgb(255, 165, 0)',
+    'rgb(0, 128, 0)', 'rgb(128, 0, 128)', 'rgb(255, 0, 0)',
+    'rgb(0, 255, 0)', 'rgb(0, 0, 255)', 'rgb(255, 255, 0)'
+]
+
+# Above this many machines, per-bar text labels are dropped and values are shown on hover only
+MAX_BAR_LABELS = 30
+
 class ScheduleVisualizer:
     def __init__(self):
         pass # No need for pre-defined colors here
     
+    def _bar_labels(self, values):
+        """Return per-bar percentage labels, or None when there are too many bars to lay out."""
+        if len(values) > MAX_BAR_LABELS:
+            return None
+        return [f'{u:.1f}%' for u in values]
+    
     def create_gantt_chart(self, schedule_df):
         """Create a Gantt chart from the schedule DataFrame."""
-        # Prepare data for Gantt chart
-        tasks = []
-        unique_jobs = sorted(schedule_df['JobID'].unique())
+        import plotly.graph_objects as go
         
-        # Define a palette of colors for jobs. Expand if more jobs are expected.
-        # These are a few distinct colors, you can add more.
-        color_palette = [
-            'rgb(46, 137, 205)', 'rgb(114, 44, 121)', 'rgb(198, 47, 105)',
-            'rgb(58, 149, 136)', 'rgb(107, 127, 135)', 'rgb(255, 165, 0)',
-            'rgb(0, 128, 0)', 'rgb(128, 0, 128)', 'rgb(255, 0, 0)',
-            'rgb(0, 255, 0)', 'rgb(0, 0, 255)', 'rgb(255, 255, 0)'
-        ]
+        unique_jobs = sorted(schedule_df['JobID'].unique())
 
         # Create a dictionary to map JobID to colors
-        job_colors = {}
-        for i, job_id in enumerate(unique_jobs):
-            job_colors[f"Job {job_id}"] = color_palette[i % len(color_palette)]
+        job_colors = {job_id: JOB_COLOR_PALETTE[i % len(JOB_COLOR_PALETTE)]
+                      for i, job_id in enumerate(unique_jobs)}
 
-        for _, row in schedule_df.iterrows():
-            tasks.append(dict(
-                Task=f"Machine {row['MachineID']}",
-                Start=row['Start'],
-                Finish=row['End'],
-                Resource=f"Job {row['JobID']}",
-                Description=f"Task {row['TaskID']}"
+        # One horizontal bar trace per job: each bar starts at its task's Start
+        # (base) and spans its duration (x), on the row of its machine (y)
+        fig = go.Figure()
+        for job_id, group in schedule_df.groupby('JobID', sort=True, observed=True):
+            starts = group['Start'].to_numpy()
+            durations = group['End'].to_numpy() - starts
+            fig.add_trace(go.Bar(
+                orientation='h',
+                y=('Machine ' + group['MachineID'].astype(str)).to_numpy(),
+                x=durations,
+                base=starts,
+                name=f'Job {job_id}',
+                marker_color=job_colors[job_id],
+                # With base set, plotly's hover %{x} is base + x (the end time), so the
+                # duration is passed separately alongside the task ID
+                customdata=np.column_stack([group['TaskID'].to_numpy(), durations]),
+                hovertemplate=f'Job {job_id}, Task %{{customdata[0]}}<br>'
+                              'Start %{base}, End %{x}, Duration %{customdata[1]}<extra></extra>'
             ))
-        
-        # Create Gantt chart using the dynamically generated job_colors
-        fig = ff.create_gantt(
-            tasks,
-            colors=job_colors,
-            index_col='Resource',
-            show_colorbar=True,
-            group_tasks=True,
-            showgrid_x=True,
-            showgrid_y=True
-        )
+        fig.update_xaxes(showgrid=True)
+        fig.update_yaxes(showgrid=True, categoryorder='category ascending')
         
         # Update layout
         fig.update_layout(
@@ -53,22 +63,26 @@ class ScheduleVisualizer:
             xaxis_title='Time',
             yaxis_title='Machine',
             height=400,
-            font=dict(size=10)
+            font=dict(size=10),
+            barmode='overlay',
+            bargap=0.2
         )
         
         return fig
     
-    def create_utilization_chart(self, utilization_dict):
+    def create_utilization_chart(self, machines, rates):
         """Create a bar chart showing machine utilization rates."""
-        machines = list(utilization_dict.keys())
-        utilization = [rate * 100 for rate in utilization_dict.values()]
+        import plotly.graph_objects as go
+        
+        utilization = np.asarray(rates) * 100
         
         fig = go.Figure(data=[
             go.Bar(
                 x=machines,
                 y=utilization,
-                text=[f'{u:.1f}%' for u in utilization],
+                text=self._bar_labels(utilization),
                 textposition='auto',
+                hovertemplate='%{x}: %{y:.1f}%<extra></extra>',
             )
         ])
         
@@ -77,31 +91,35 @@ class ScheduleVisualizer:
             xaxis_title='Machine',
             yaxis_title='Utilization Rate (%)',
             yaxis_range=[0, 100],
-            height=400
+            height=400,
+            uirevision='util'
         )
         
         return fig
     
-    def create_comparison_chart(self, before_util, after_util):
+    def create_comparison_chart(self, machines, before_rates, after_rates):
         """Create a comparison chart of utilization rates before and after optimization."""
-        machines = list(before_util.keys())
-        before = [rate * 100 for rate in before_util.values()]
-        after = [rate * 100 for rate in after_util.values()]
+        import plotly.graph_objects as go
+        
+        before = np.asarray(before_rates) * 100
+        after = np.asarray(after_rates) * 100
         
         fig = go.Figure(data=[
             go.Bar(
                 name='Before Optimization',
                 x=machines,
                 y=before,
-                text=[f'{u:.1f}%' for u in before],
+                text=self._bar_labels(before),
                 textposition='auto',
+                hovertemplate='%{x}: %{y:.1f}%',
             ),
             go.Bar(
                 name='After Optimization',
                 x=machines,
                 y=after,
-                text=[f'{u:.1f}%' for u in after],
+                text=self._bar_labels(after),
                 textposition='auto',
+                hovertemplate='%{x}: %{y:.1f}%',
             )
         ])
         
@@ -111,7 +129,8 @@ class ScheduleVisualizer:
             yaxis_title='Utilization Rate (%)',
             yaxis_range=[0, 100],
             barmode='group',
-            height=400
+            height=400,
+            uirevision='util'
         )
         
         return fig 
\ No newline at end of file